@@ -36,6 +36,7 @@ setup(
                         'pygeo>=0.1.0',
                         'SimPEG',
                         'future',
+                        'futures; python_version<"3"',
                        ],
     author = 'Brendan Smithyman',
     author_email = 'brendan@bitsmithy.net',
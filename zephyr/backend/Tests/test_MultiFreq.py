@@ -0,0 +1,110 @@
+import gc
+import os
+import unittest
+import numpy as np
+from zephyr.backend import MultiFreq, MiniZephyr, SimpleSource
+from zephyr.backend.distributors import SHAREDMEM, _solveShared
+
+class _FailingSolve(object):
+    'Stands in for a subProblem whose solve fails while holding the RHS'
+
+    def __mul__(self, rhs):
+        # Keep the shared buffer exported past the failure, as a
+        # traceback into a failed solve can
+        self.held = memoryview(rhs.base)
+        raise ValueError('singular matrix')
+
+class TestMultiFreq(unittest.TestCase):
+
+    @staticmethod
+    def _elementNorm(arr):
+        return np.sqrt((arr.conj()*arr).sum()) / arr.size
+
+    @staticmethod
+    def _systemConfig(parallel):
+
+        return {
+            'c':        2500.,                          # m/s
+            'rho':      1.,                             # density
+            'nx':       50,                             # count
+            'nz':       60,                             # count
+            'freqs':    [100., 200., 300.],             # Hz
+            'Disc':     MiniZephyr,
+            'parallel': parallel,
+            'nWorkers': 2,
+        }
+
+    def _compareParallel(self, parallel):
+
+        sloc = np.array([[20., 25.], [30., 40.]])
+        q = SimpleSource(self._systemConfig(False))(sloc)
+
+        uSerial = list(MultiFreq(self._systemConfig(False)) * q)
+
+        mf = MultiFreq(self._systemConfig(parallel))
+        uParallel = list(mf * q)
+        del mf.factors
+
+        self.assertEqual(len(uSerial), len(uParallel))
+        for us, up in zip(uSerial, uParallel):
+            self.assertEqual(us.shape, up.shape)
+            self.assertTrue(self._elementNorm(us - up) < 1e-12)
+
+    def test_compareProcess(self):
+
+        self._compareParallel(True)
+
+    def test_compareThread(self):
+
+        self._compareParallel('thread')
+
+    def test_invalidParallel(self):
+
+        mf = MultiFreq(self._systemConfig('threads'))
+        with self.assertRaises(ValueError):
+            mf.parallel
+
+    def test_flagParallel(self):
+
+        self.assertEqual(MultiFreq(self._systemConfig(0)).parallel, False)
+        self.assertEqual(MultiFreq(self._systemConfig(1)).parallel, 'process')
+        self.assertEqual(MultiFreq(self._systemConfig(np.bool_(True))).parallel, 'process')
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), 'requires POSIX shared memory listing')
+    def test_unstartedReleasesShared(self):
+
+        sloc = np.array([[20., 25.]])
+        q = SimpleSource(self._systemConfig(False))(sloc)
+        mf = MultiFreq(self._systemConfig(True))
+
+        before = set(os.listdir('/dev/shm'))
+        u = mf * q
+        del u
+        gc.collect()
+        after = set(os.listdir('/dev/shm'))
+        del mf.factors
+
+        self.assertEqual(after - before, set())
+
+    @unittest.skipUnless(SHAREDMEM, 'requires multiprocessing.shared_memory')
+    def test_workerFailure(self):
+
+        from multiprocessing import shared_memory
+
+        rhs = np.ones((10, 1), dtype=np.complex128)
+        shm = shared_memory.SharedMemory(create=True, size=rhs.nbytes)
+        sub = _FailingSolve()
+        try:
+            try:
+                _solveShared(sub, shm.name, rhs.shape, rhs.dtype)
+            except ValueError:
+                sub.held.release()
+            else:
+                self.fail('ValueError not raised')
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,6 @@ Discretization base classes for Zephyr
 from __future__ import division, unicode_literals, print_function, absolute_import
 from future import standard_library
 standard_library.install_aliases()
-from builtins import map
 
 import copy
 from galoshes import BaseSCCache
@@ -40,6 +39,30 @@ class BaseDiscretization(BaseModelDependent):
         'Computed damping coefficient to be added to real omega'
         return 1j / self.tau
 
+    @property
+    def omega(self):
+        'Angular frequency'
+
+        if getattr(self, '_omega', None) is None:
+            self._omega = 2*np.pi * self.freq
+        return self._omega
+
+    @property
+    def omegaDamped(self):
+        'Angular frequency including the Laplace-domain damping term'
+
+        if getattr(self, '_omegaDamped', None) is None:
+            self._omegaDamped = self.omega - self.dampCoeff
+        return self._omegaDamped
+
+    @property
+    def omegaDamped2(self):
+        'Square of the damped angular frequency, as used in the mass term'
+
+        if getattr(self, '_omegaDamped2', None) is None:
+            self._omegaDamped2 = self.omegaDamped * self.omegaDamped
+        return self._omegaDamped2
+
     @property
     def premul(self):
         'A premultiplication factor, used by 2.5D and half differentiation'
@@ -48,15 +71,21 @@ class BaseDiscretization(BaseModelDependent):
 
     @property
     def c(self):
-        'Complex wave velocity'
+        '''
+        Complex wave velocity. A scalar value is returned as a read-only
+        broadcast view of shape (nz, nx); copy it before writing.
+        '''
         if isinstance(self._c, np.ndarray):
             return self._c
         else:
-            return self._c * np.ones((self.nz, self.nx), dtype=np.complex128)
+            return np.broadcast_to(np.complex128(self._c), (self.nz, self.nx))
 
     @property
     def rho(self):
-        'Bulk density'
+        '''
+        Bulk density. A scalar value is returned as a read-only
+        broadcast view of shape (nz, nx); copy it before writing.
+        '''
 
         # NB: QC says to merge these two statements. Do not do that. The code
         #     "hasattr(self, '_rho') and not isinstance(self._rho, np.ndarray)"
@@ -65,7 +94,7 @@ class BaseDiscretization(BaseModelDependent):
 
         if hasattr(self, '_rho'):
             if not isinstance(self._rho, np.ndarray):
-                return self._rho * np.ones((self.nz, self.nx), dtype=np.float64)
+                return np.broadcast_to(np.float64(self._rho), (self.nz, self.nx))
         else:
             self._rho = 310. * self.c.real**0.25
 
@@ -79,9 +108,11 @@ class BaseDiscretization(BaseModelDependent):
     def Ainv(self):
         'Instance of a Solver class that implements forward modelling'
 
+        # The factorization is held for the lifetime of the instance, so
+        # repeated solves reuse it; A is only copied if it is not already CSC
         if not hasattr(self, '_Ainv'):
             self._Ainv = DirectSolver(getattr(self, '_Solver', None))
-            self._Ainv.A = self.A.tocsc()
+            self._Ainv.A = self.A.tocsc(copy=False)
         return self._Ainv
     @Ainv.deleter
     def Ainv(self):
@@ -145,11 +176,18 @@ class DiscretizationWrapper(BaseSCCache):
 
     @property
     def subProblems(self):
-        'Returns subProblem instances based on the discretization.'
+        '''
+        Returns subProblem instances based on the discretization.
+
+        The instances (and any factorizations they hold) are built once
+        from the current systemConfig and reused by every subsequent
+        multiplication until the cache is cleared, so the configuration
+        (e.g., freqs) must be complete before first access.
+        '''
 
         if getattr(self, '_subProblems', None) is None:
 
-            self._subProblems = list(map(self.Disc, self._spConfigs))
+            self._subProblems = tuple(self.Disc(spConfig) for spConfig in self._spConfigs)
         return self._subProblems
 
     @property
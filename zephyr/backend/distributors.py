@@ -6,13 +6,16 @@ from builtins import super
 from future import standard_library
 standard_library.install_aliases()
 from builtins import zip, range
+from past.builtins import basestring
 
 import types
+import weakref
 from galoshes import SCFilter, BaseSCCache
 import numpy as np
 from .discretization import DiscretizationWrapper
 from .interpolation import SplineGridInterpolator
 from .base import BaseModelDependent
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 try:
     import multiprocessing
@@ -21,14 +24,63 @@ except ImportError:
 else:
     PARALLEL = True
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    SHAREDMEM = False
+else:
+    SHAREDMEM = True
+
 PARTASK_TIMEOUT = None
 
+def _solveShared(sub, name, shape, dtype):
+    '''
+    Worker-side solve for a right-hand side that lives in shared memory.
+
+    Args:
+        sub (BaseDiscretization): The subProblem to solve
+        name (str): Name of the shared memory block holding the RHS
+        shape (tuple): Shape of the RHS array
+        dtype (np.dtype): Data type of the RHS array
+
+    Returns:
+        np.ndarray: Wavefield
+    '''
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return sub * np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A failed solve can leave views of the block alive through
+            # its traceback; let the original exception through, and the
+            # mapping is closed when those views are collected
+            pass
+
+def _releaseShared(shm, plist):
+    '''
+    Cancels or waits for the tasks that use a shared memory block, then
+    closes and unlinks the block.
+
+    Args:
+        shm (SharedMemory): The shared memory block
+        plist (list): Futures for the tasks that read from it
+    '''
+
+    for p in plist:
+        p.cancel()
+    wait(plist)
+    shm.close()
+    shm.unlink()
+
 class BaseDist(DiscretizationWrapper):
 
     initMap = {
     #   Argument        Required    Rename as ...   Store as type
         'Disc':         (True,      '_Disc',        None),
-        'parallel':     (False,     '_parallel',    bool),
+        'parallel':     (False,     '_parallel',    None),
         'nWorkers':     (False,     '_nWorkers',    np.int64),
         'remDists':     (False,     None,           list),
     }
@@ -73,17 +125,34 @@ class BaseMPDist(BaseDist):
 
     @property
     def parallel(self):
-        'Determines whether to operate in parallel'
+        '''
+        Determines whether to operate in parallel, and how: 'process'
+        distributes subProblems to worker processes, 'thread' runs them
+        in threads of this process (useful when the solver releases the
+        GIL), and False runs them serially. Any other non-string value
+        is taken as a flag, with true values meaning 'process'; unknown
+        strings raise a ValueError.
+        '''
 
-        return PARALLEL and getattr(self, '_parallel', True)
+        mode = getattr(self, '_parallel', True)
+        if not isinstance(mode, basestring):
+            mode = 'process' if mode else False
+        elif mode not in ('process', 'thread'):
+            raise ValueError('parallel must be a flag, \'process\' or \'thread\', not %r'%(mode,))
+        if not PARALLEL:
+            return False
+        return mode
 
     @property
     def pool(self):
-        'Returns a configured multiprocessing Pool'
+        'Returns a configured persistent process or thread pool executor'
 
         if self.parallel:
             if not hasattr(self, '_pool'):
-                self._pool = multiprocessing.Pool(self.nWorkers)
+                if self.parallel == 'thread':
+                    self._pool = ThreadPoolExecutor(self.nWorkers)
+                else:
+                    self._pool = ProcessPoolExecutor(self.nWorkers)
             return self._pool
 
         else:
@@ -136,6 +205,7 @@ class BaseMPDist(BaseDist):
             u (iterator over np.ndarrays): Wavefields
         '''
 
+        shared = False
         if isinstance(rhs, list):
             def getRHS(i):
                 'Get right-hand sides for multiple system sources'
@@ -154,24 +224,69 @@ class BaseMPDist(BaseDist):
                 nrhs = rhs.reshape((rhs.size, 1))
             else:
                 nrhs = rhs
+            shared = True
             def getRHS(i):
                 'Get right-hand sides for single system sources'
                 return nrhs
 
         if self.parallel:
+            if self.parallel == 'process' and shared and SHAREDMEM and isinstance(nrhs, np.ndarray):
+                return self._spoolShared(nrhs)
+
             plist = []
             for i, sub in enumerate(self.subProblems):
 
-                p = self.pool.apply_async(sub, (getRHS(i),))
+                p = self.pool.submit(sub, getRHS(i))
                 plist.append(p)
 
-            u = (self.scaleTerm*p.get(PARTASK_TIMEOUT) for p in plist)
+            u = (self.scaleTerm*p.result(PARTASK_TIMEOUT) for p in plist)
 
         else:
             u = (self.scaleTerm*(sub*getRHS(i)) for i, sub in enumerate(self.subProblems))
 
         return u
 
+    def _spoolShared(self, rhs):
+        '''
+        Distributes a single dense right-hand side to all subProblems
+        through a shared memory block, so that workers map the array
+        instead of receiving a pickled copy.
+
+        Args:
+            rhs (np.ndarray): Source vectors
+
+        Returns:
+            u (iterator over np.ndarrays): Wavefields
+        '''
+
+        shm = shared_memory.SharedMemory(create=True, size=max(rhs.nbytes, 1))
+        try:
+            buf = np.ndarray(rhs.shape, dtype=rhs.dtype, buffer=shm.buf)
+            buf[:] = rhs
+            del buf
+
+            plist = [self.pool.submit(_solveShared, sub, shm.name, rhs.shape, rhs.dtype) for sub in self.subProblems]
+        except:
+            shm.close()
+            shm.unlink()
+            raise
+
+        scaleTerm = self.scaleTerm
+
+        def spool():
+            try:
+                for p in plist:
+                    yield scaleTerm*p.result(PARTASK_TIMEOUT)
+            finally:
+                release()
+
+        # The block is released when the generator finishes or is closed,
+        # and also if it is discarded without ever being started
+        u = spool()
+        release = weakref.finalize(u, _releaseShared, shm, plist)
+
+        return u
+
     @property
     def factors(self):
         # What this does:
@@ -183,7 +298,7 @@ class BaseMPDist(BaseDist):
     @factors.deleter
     def factors(self):
         if hasattr(self, '_pool'):
-            self._pool.close()
+            self._pool.shutdown(wait=False)
             del self._pool
         if hasattr(self, '_subProblems'):
             for sp in self.subProblems:
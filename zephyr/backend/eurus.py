@@ -50,8 +50,6 @@ class Eurus(BaseDiscretization, BaseAnisotropic):
         # fast --> slow is x --> y --> z as Fortran
 
         # Set up physical properties in matrices with padding
-        omega   = 2*np.pi * self.freq
-
         def pad(arr):
             return np.pad(arr, 1, 'edge')
 
@@ -65,7 +63,7 @@ class Eurus(BaseDiscretization, BaseAnisotropic):
         dzz = dz**2.
         dxz = (dxx+dzz)/2.
         dd  = np.sqrt(dxz)
-        omegaDamped = omega - self.dampCoeff
+        omegaDamped = self.omegaDamped
 
         # PML decay terms
         # NB: Arrays are padded later, but 'c' in these lines
@@ -226,7 +224,7 @@ class Eurus(BaseDiscretization, BaseAnisotropic):
         b_LN4_C = ((b_EE + b_HH) / 2) / Xi_x_C
 
         # Model parameter M
-        K = (omegaDamped * omegaDamped) / (rhoPad * cPad**2)
+        K = self.omegaDamped2 / (rhoPad * cPad**2)
         #K = (omega**2) / (rhoPad * cPad**2)
 
         # K = omega^2/(c^2 . rho)
@@ -446,21 +444,21 @@ class Eurus(BaseDiscretization, BaseAnisotropic):
         offsets = [offsets[key] for key in keys]
 
         M1_diagonals = [M1_diagonals[key] for key in keys]
-        M1_A = sp.diags(M1_diagonals, offsets, shape=(nrows, nrows), format='csr', dtype=np.complex128)
+        M1_A = sp.diags(M1_diagonals, offsets, shape=(nrows, nrows), format='csc', dtype=np.complex128)
 
         M2_diagonals = [M2_diagonals[key] for key in keys]
-        M2_A = sp.diags(M2_diagonals, offsets, shape=(nrows, nrows), format='csr', dtype=np.complex128)
+        M2_A = sp.diags(M2_diagonals, offsets, shape=(nrows, nrows), format='csc', dtype=np.complex128)
 
         M3_diagonals = [M3_diagonals[key] for key in keys]
-        M3_A = sp.diags(M3_diagonals, offsets, shape=(nrows, nrows), format='csr', dtype=np.complex128)
+        M3_A = sp.diags(M3_diagonals, offsets, shape=(nrows, nrows), format='csc', dtype=np.complex128)
 
         M4_diagonals = [M4_diagonals[key] for key in keys]
-        M4_A = sp.diags(M4_diagonals, offsets, shape=(nrows, nrows), format='csr', dtype=np.complex128)
+        M4_A = sp.diags(M4_diagonals, offsets, shape=(nrows, nrows), format='csc', dtype=np.complex128)
 
         # A = [M1_A M2_A
         #      M3_A M4_A]
 
-        A = sp.bmat([[M1_A, M2_A],[M3_A,M4_A]])
+        A = sp.bmat([[M1_A, M2_A],[M3_A,M4_A]], format='csc')
         return A
 
     @staticmethod
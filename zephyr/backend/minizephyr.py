@@ -37,6 +37,8 @@ class MiniZephyr(BaseDiscretization):
         'mord':         (False,     '_mord',        tuple),
     }
 
+    _pmlCache = {}
+
     def _initHelmholtzNinePoint(self):
         '''
         An attempt to reproduce the finite-difference stencil and the
@@ -61,8 +63,7 @@ class MiniZephyr(BaseDiscretization):
         # fast --> slow is x --> y --> z as Fortran
 
         # Set up physical properties in matrices with padding
-        omega   = 2*np.pi * self.freq
-        omegaDamped = omega - self.dampCoeff
+        omegaDamped = self.omegaDamped
 
         def pad(arr):
             return np.pad(arr, 1, 'edge')
@@ -87,46 +88,17 @@ class MiniZephyr(BaseDiscretization):
         # NB: Arrays are padded later, but 'c' in these lines
         #     comes from the original (un-padded) version
 
-        nPML    = self.nPML
-
-        pmldx   = dx*(nPML - 1)
-        pmldz   = dz*(nPML - 1)
-        pmlr    = 1e-3
-        pmlfx   = 3.0 * np.log(1/pmlr)/(2*pmldx**3)
-        pmlfz   = 3.0 * np.log(1/pmlr)/(2*pmldz**3)
-
-        dpmlx   = np.zeros(dims, dtype=np.complex128)
-        dpmlz   = np.zeros(dims, dtype=np.complex128)
-        isnx    = np.zeros(dims, dtype=np.float64)
-        isnz    = np.zeros(dims, dtype=np.float64)
-
-        # Only enable PML if the free surface isn't set
-
-        if not freeSurf[2]:
-            isnz[-nPML:,:] = -1 # Top
-
-        if not freeSurf[1]:
-            isnx[:,-nPML:] = -1 # Right Side
-
-        if not freeSurf[0]:
-            isnz[:nPML,:] = 1 # Bottom
-
-        if not freeSurf[3]:
-            isnx[:,:nPML] = 1 # Left side
+        isnx, isnz, pmlqx, pmldqx, pmlqz, pmldqz = self._pmlProfiles()
 
-        dpmlx[:,:nPML] = (np.arange(nPML, 0, -1)*dx).reshape((1,nPML))
-        dpmlx[:,-nPML:] = (np.arange(1, nPML+1, 1)*dx).reshape((1,nPML))
-        dnx     = pmlfx*c*dpmlx**2
-        ddnx    = 2*pmlfx*c*dpmlx
+        dnx     = c*pmlqx
+        ddnx    = c*pmldqx
         denx    = dnx + iom
         r1x     = iom / denx
         r1xsq   = r1x**2
         r2x     = isnx*r1xsq*ddnx/denx
 
-        dpmlz[:nPML,:] = (np.arange(nPML, 0, -1)*dz).reshape((nPML,1))
-        dpmlz[-nPML:,:] = (np.arange(1, nPML+1, 1)*dz).reshape((nPML,1))
-        dnz     = pmlfz*c*dpmlz**2
-        ddnz    = 2*pmlfz*c*dpmlz
+        dnz     = c*pmlqz
+        ddnz    = c*pmldqz
         denz    = dnz + iom
         r1z     = iom / denz
         r1zsq   = r1z**2
@@ -188,7 +160,7 @@ class MiniZephyr(BaseDiscretization):
         bPP = (bEE + bPP) / 2 # c2
 
         # Model parameter M
-        K = ((omegaDamped**2 / cPad**2) - aky**2) / rhoPad
+        K = ((self.omegaDamped2 / cPad**2) - aky**2) / rhoPad
 
         # K = omega^2/(c^2 . rho)
         kMM = K[0:-2,0:-2] # bottom left
@@ -249,10 +221,87 @@ class MiniZephyr(BaseDiscretization):
         diagonals = [diagonals[key] for key in keys]
         offsets = [offsets[key] for key in keys]
 
-        A = scipy.sparse.diags(diagonals, offsets, shape=(nrows, nrows), format='csr', dtype=np.complex128)
+        A = scipy.sparse.diags(diagonals, offsets, shape=(nrows, nrows), format='csc', dtype=np.complex128)
 
         return A
 
+    def _pmlProfiles(self):
+        '''
+        Computes the frequency-independent parts of the PML decay terms,
+        which depend only on the grid and the boundary configuration.
+        The x terms vary only along x and the z terms only along z, so
+        they are kept as (1, nx) and (nz, 1) vectors that broadcast
+        against (nz, nx) model arrays. The most recent set is cached at
+        class level, keyed by (nz, nx, nPML, dx, dz, freeSurf), so that
+        subProblems that share a grid (e.g., multiple frequencies or
+        wavenumbers) build them once.
+
+        Returns:
+            tuple: (isnx, isnz, qx, dqx, qz, dqz), where isn? select the
+                active PML regions and its sign, and q? and dq? are the
+                decay profile and its derivative before scaling by c
+        '''
+
+        nx = self.nx
+        nz = self.nz
+        dx = self.dx
+        dz = self.dz
+        nPML = self.nPML
+        freeSurf = tuple(self.freeSurf)
+
+        key = (nz, nx, nPML, dx, dz, freeSurf)
+        profiles = self._pmlCache.get(key)
+        if profiles is not None:
+            return profiles
+
+        pmldx   = dx*(nPML - 1)
+        pmldz   = dz*(nPML - 1)
+        pmlr    = 1e-3
+        pmlfx   = 3.0 * np.log(1/pmlr)/(2*pmldx**3)
+        pmlfz   = 3.0 * np.log(1/pmlr)/(2*pmldz**3)
+
+        dpmlx   = np.zeros((1, nx), dtype=np.float64)
+        dpmlz   = np.zeros((nz, 1), dtype=np.float64)
+        isnx    = np.zeros((1, nx), dtype=np.float64)
+        isnz    = np.zeros((nz, 1), dtype=np.float64)
+
+        # Only enable PML if the free surface isn't set
+
+        if not freeSurf[2]:
+            isnz[-nPML:,:] = -1 # Top
+
+        if not freeSurf[1]:
+            isnx[:,-nPML:] = -1 # Right Side
+
+        if not freeSurf[0]:
+            isnz[:nPML,:] = 1 # Bottom
+
+        if not freeSurf[3]:
+            isnx[:,:nPML] = 1 # Left side
+
+        dpmlx[:,:nPML] = (np.arange(nPML, 0, -1)*dx).reshape((1,nPML))
+        dpmlx[:,-nPML:] = (np.arange(1, nPML+1, 1)*dx).reshape((1,nPML))
+
+        dpmlz[:nPML,:] = (np.arange(nPML, 0, -1)*dz).reshape((nPML,1))
+        dpmlz[-nPML:,:] = (np.arange(1, nPML+1, 1)*dz).reshape((nPML,1))
+
+        profiles = (
+            isnx,
+            isnz,
+            pmlfx*dpmlx**2,
+            2*pmlfx*dpmlx,
+            pmlfz*dpmlz**2,
+            2*pmlfz*dpmlz,
+        )
+        for arr in profiles:
+            arr.setflags(write=False)
+
+        # Keep only the latest grid, so the cache does not grow with
+        # every model configuration seen by this process
+        self._pmlCache.clear()
+        self._pmlCache[key] = profiles
+        return profiles
+
     @staticmethod
     def _setupBoundary(diagonals, freeSurf):
         '''
@@ -189,7 +189,7 @@ class PickleOutputJob(Job):
     def saveData(self, data):
 
         with open(self.projnm, 'wb') as fp:
-            pickler = pickle.Pickler(fp)
+            pickler = pickle.Pickler(fp, pickle.HIGHEST_PROTOCOL)
             pickler.dump(data)
 
 
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import scipy.io as io
+from zephyr.middleware.db import UtoutWriter, FullwvDatastore, _LazyHandle, _fastSEGYRead
+
+class TestUtoutWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.mkdtemp()
+        os.chdir(self.tmpdir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir)
+
+    @staticmethod
+    def _referenceWrite(outfile, data, ofreqs):
+        'One FortranFile record per frequency, as originally written'
+
+        nrec, nsrc, nfreq = data.shape
+        with io.FortranFile(outfile, 'w') as ff:
+            for i, freq in enumerate(ofreqs):
+                panel = np.empty((nsrc, nrec+1), dtype=np.complex64)
+                panel[:,:1] = freq
+                panel[:,1:] = data[:,:,i].T
+                ff.write_record(panel.ravel())
+
+    def test_matchesFortranFile(self):
+
+        nrec, nsrc = 7, 5
+        freqs = [1., 2.5, 4., 10.]
+        tau = 2.
+        data = np.random.randn(nrec, nsrc, len(freqs)) + 1j*np.random.randn(nrec, nsrc, len(freqs))
+
+        utow = UtoutWriter({'projnm': 'test', 'freqs': freqs, 'tau': tau})
+        utow(data)
+
+        ofreqs = [(2*np.pi * freq) + 1j / tau for freq in freqs]
+        self._referenceWrite('reference.utout', data, ofreqs)
+
+        with open('test.utout', 'rb') as fp:
+            written = fp.read()
+        with open('reference.utout', 'rb') as fp:
+            reference = fp.read()
+
+        self.assertEqual(written, reference)
+
+        with io.FortranFile('test.utout', 'r') as ff:
+            for i in range(len(freqs)):
+                panel = ff.read_record(np.complex64).reshape((nsrc, nrec+1))
+                self.assertTrue(np.all(panel[:,1:] == data[:,:,i].T.astype(np.complex64)))
+
+class TestFastSEGYRead(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'test.vp')
+        self.samples = np.arange(6*11, dtype=np.float32).reshape((6, 11)) + 1500.
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _writeSEGY(self, endian='>', fmt=5, nExt=0, trns=None, extra=b''):
+        'Writes a minimal fixed-length SEG-Y file with the given header fields'
+
+        ntr, ns = self.samples.shape
+        if trns is None:
+            trns = ns
+
+        header = np.zeros(3600, dtype=np.uint8)
+        header[3220:3222] = np.frombuffer(np.array(ns, dtype=endian+'u2').tobytes(), dtype=np.uint8)
+        header[3224:3226] = np.frombuffer(np.array(fmt, dtype=endian+'i2').tobytes(), dtype=np.uint8)
+        header[3504:3506] = np.frombuffer(np.array(nExt, dtype=endian+'i2').tobytes(), dtype=np.uint8)
+
+        traces = np.zeros(ntr, dtype=[
+            ('hdr1',    'V114'),
+            ('ns',      endian+'u2'),
+            ('hdr2',    'V124'),
+            ('samples', endian+'f4', (ns,)),
+        ])
+        traces['ns'] = trns
+        traces['samples'] = self.samples
+
+        with open(self.filename, 'wb') as fp:
+            fp.write(header.tobytes())
+            fp.write(traces.tobytes())
+            fp.write(extra)
+
+    def _checkRead(self, endian):
+
+        self._writeSEGY(endian=endian)
+        traces = _fastSEGYRead(self.filename)
+        self.assertIsNotNone(traces)
+        self.assertEqual(traces['samples'].dtype, np.dtype(endian+'f4'))
+        self.assertTrue(np.all(traces['samples'] == self.samples))
+
+        frozen = FullwvDatastore._frozen(FullwvDatastore.sfWrapper(self.filename).T)
+        del traces
+        self.assertTrue(frozen.dtype.isnative)
+        self.assertTrue(frozen.flags.c_contiguous)
+        self.assertTrue(np.all(frozen == self.samples.T))
+
+    def test_bigEndian(self):
+
+        self._checkRead('>')
+
+    def test_littleEndian(self):
+
+        self._checkRead('<')
+
+    def test_readPanelReleases(self):
+
+        self._writeSEGY()
+        ds = FullwvDatastore.__new__(FullwvDatastore)
+        ds.handled = {'test.utobs1.000': _LazyHandle(FullwvDatastore.sfWrapper, self.filename)}
+
+        panel = ds.readPanel('test.utobs1.000')
+        self.assertTrue(np.all(panel == (self.samples[::2] + 1j*self.samples[1::2]).T))
+        self.assertFalse(ds.handled['test.utobs1.000'].loaded)
+
+    def test_ibmFloat(self):
+
+        self._writeSEGY(fmt=1)
+        self.assertIsNone(_fastSEGYRead(self.filename))
+
+    def test_extendedHeader(self):
+
+        self._writeSEGY(nExt=1)
+        self.assertIsNone(_fastSEGYRead(self.filename))
+
+    def test_traceLength(self):
+
+        self._writeSEGY(trns=self.samples.shape[1] + 1)
+        self.assertIsNone(_fastSEGYRead(self.filename))
+
+    def test_fileSize(self):
+
+        self._writeSEGY(extra=b'\x00'*4)
+        self.assertIsNone(_fastSEGYRead(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from zephyr.middleware.db import ftypeRegex
+from zephyr.middleware.util import compileDict, compileCombined, matchCombined
+
+class TestCombinedRegex(unittest.TestCase):
+
+    projnm = 'proj'
+
+    filenames = [
+        'proj.vp',
+        'proj3.vp',
+        'proj3.vp5.0',
+        'proj12.vp2.500.ext',
+        'proj.vpi',
+        'proj.vpi2.0',
+        'proj12.vpi3.5',
+        'proj.qp',
+        'proj4.qp1.25',
+        'proj.rho',
+        'proj.eps2d',
+        'proj.del2d',
+        'proj.theta',
+        'proj.src',
+        'proj.newsrc',
+        'proj.src.avg',
+        'proj.newsrc.avg',
+        'proj.utobs2.500',
+        'proj.vzest10.0',
+        'proj.vxobs1.0',
+        'proj.udobs1.0',
+        'proj2.gvp1.5',
+        'proj2.gvpa1.5',
+        'proj.wave3.0',
+        'proj2.bwave3.0',
+        'proj.sl',
+        'proj.sl4',
+        'proj.ini',
+        'proj.vpx',
+        'proj.rhox',
+        'other.vp',
+        'otherproj.vp',
+    ]
+
+    @staticmethod
+    def _matchLoop(redict, filename):
+        'Reference behaviour: try each compiled expression in turn'
+
+        for key in redict:
+            match = redict[key].match(filename)
+            if match is not None:
+                return key, match.groupdict()
+        return None, None
+
+    def test_matchesPerTypeLoop(self):
+
+        redict = compileDict(self.projnm, ftypeRegex)
+        combined = compileCombined(self.projnm, ftypeRegex)
+
+        for filename in self.filenames:
+            self.assertEqual(
+                matchCombined(combined, filename),
+                self._matchLoop(redict, filename),
+                filename,
+            )
+
+    def test_precedence(self):
+
+        combined = compileCombined(self.projnm, ftypeRegex)
+
+        self.assertEqual(matchCombined(combined, 'proj.vp')[0], 'vp')
+        self.assertEqual(matchCombined(combined, 'proj.vpi')[0], 'vpi')
+        self.assertEqual(matchCombined(combined, 'proj.vpi2.0')[0], 'vpi')
+
+    def test_groups(self):
+
+        combined = compileCombined(self.projnm, ftypeRegex)
+
+        self.assertEqual(matchCombined(combined, 'proj3.vp5.0'), ('vp', {'iter': '3', 'freq': '5.0'}))
+        self.assertEqual(matchCombined(combined, 'proj.newsrc.avg'), ('src', {}))
+        self.assertEqual(matchCombined(combined, 'proj.utobs2.500'), ('data', {'freq': '2.500'}))
+        self.assertEqual(matchCombined(combined, 'other.vp'), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,17 +3,22 @@ from builtins import open
 from future import standard_library
 standard_library.install_aliases()
 from builtins import object
+from past.builtins import basestring
 
 import os
-import glob
+import queue
+import threading
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
 # import pymongo
 # import h5py
 import numpy as np
-import scipy.io as io
 from pygeo.segyread import SEGYFile
 import pickle
 
-from .util import compileDict, readini
+from .util import compileCombined, matchCombined, readini
 from .time import BaseTimeSensitive, TimeMachine
 
 ftypeRegex = {
@@ -32,6 +37,59 @@ ftypeRegex = {
     'slice':    '^%s\.sl(?P<iter>[0-9]*)',
 }
 
+PREFETCH_POLL = 0.1
+
+SEGY_HEADER_BYTES = 3600
+SEGY_TRACE_HEADER_BYTES = 240
+
+def _fastSEGYRead(filename):
+    '''
+    Maps the traces of a fixed-length SEG-Y file with IEEE float samples
+    as a single structured array, with fields 'hdr' (raw trace header
+    bytes) and 'samples'. The file is memory-mapped, so nothing is read
+    until it is accessed.
+
+    Returns None when the file does not fit this simple layout (e.g.,
+    IBM float samples, extended textual headers or variable trace
+    lengths), in which case the caller should fall back to a full
+    SEG-Y reader.
+    '''
+
+    size = os.path.getsize(filename)
+    if size < SEGY_HEADER_BYTES + SEGY_TRACE_HEADER_BYTES:
+        return None
+
+    with open(filename, 'rb') as fp:
+        fp.seek(3220)
+        binhead = fp.read(6)
+        fp.seek(3504)
+        exthead = fp.read(2)
+        fp.seek(SEGY_HEADER_BYTES + 114)
+        trhead = fp.read(2)
+
+    for endian in ('>', '<'):
+        ns = int(np.frombuffer(binhead[:2], dtype=endian+'u2')[0])
+        fmt = int(np.frombuffer(binhead[4:], dtype=endian+'i2')[0])
+        nExt = int(np.frombuffer(exthead, dtype=endian+'i2')[0])
+        trns = int(np.frombuffer(trhead, dtype=endian+'u2')[0])
+
+        if fmt != 5 or nExt != 0 or ns == 0 or trns != ns:
+            continue
+
+        tracebytes = SEGY_TRACE_HEADER_BYTES + 4*ns
+        if (size - SEGY_HEADER_BYTES) % tracebytes:
+            continue
+
+        traceDtype = np.dtype([
+            ('hdr',     'V%d'%SEGY_TRACE_HEADER_BYTES),
+            ('samples', endian+'f4',    (ns,)),
+        ])
+        ntr = (size - SEGY_HEADER_BYTES) // tracebytes
+
+        return np.memmap(filename, dtype=traceDtype, mode='r', offset=SEGY_HEADER_BYTES, shape=(ntr,))
+
+    return None
+
 class UtoutWriter(BaseTimeSensitive):
     '''
     AttributeMapper subclass that implements writing frequency-domain
@@ -58,12 +116,66 @@ class UtoutWriter(BaseTimeSensitive):
         nrec = data.shape[0]
         nsrc = data.shape[1]
 
-        with io.FortranFile(outfile, 'w') as ff:
-            for i, freq in enumerate(ofreqs):
-                panel = np.empty((nsrc, nrec+1), dtype=np.complex64)
-                panel[:,:1] = freq
-                panel[:,1:] = data[:,:,i].T
-                ff.write_record(panel.ravel())
+        # One Fortran sequential record per frequency, laid out exactly as
+        # scipy.io.FortranFile.write_record would: a length marker, the panel, and
+        # the length marker again. All records are assembled in one buffer
+        # so that the file is written with a single call.
+        recdtype = np.dtype([
+            ('head',    np.uint32),
+            ('panel',   np.complex64,   (nsrc, nrec+1)),
+            ('tail',    np.uint32),
+        ])
+
+        records = np.empty(nfreq, dtype=recdtype)
+        records['head'] = recdtype['panel'].itemsize
+        records['tail'] = recdtype['panel'].itemsize
+        records['panel'][:,:,0] = np.array(ofreqs).reshape((nfreq, 1))
+        records['panel'][:,:,1:] = data.transpose(2,1,0)
+
+        with open(outfile, 'wb') as fp:
+            records.tofile(fp)
+
+
+class _LazyHandle(object):
+    '''
+    Defers opening a file until it is first accessed. The wrapped
+    object is constructed once, by calling factory(filename), and
+    cached thereafter.
+    '''
+
+    def __init__(self, factory, filename):
+
+        self._factory = factory
+        self.filename = filename
+        self._obj = None
+
+    @property
+    def obj(self):
+        'The wrapped file object'
+
+        if self._obj is None:
+            self._obj = self._factory(self.filename)
+        return self._obj
+
+    @property
+    def loaded(self):
+        return self._obj is not None
+
+    def release(self):
+        'Drops the wrapped object; it is opened again on next access'
+
+        self._obj = None
+
+    def __getitem__(self, item):
+        return self.obj[item]
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.obj, attr)
+
+    def __repr__(self):
+        return '<%s(%s)%s>'%(self.__class__.__name__, self.filename, '' if self.loaded else ' unloaded')
 
 
 class BaseDatastore(object):
@@ -80,6 +192,8 @@ class BaseDatastore(object):
 
 class FullwvDatastore(BaseDatastore):
 
+    _regexCache = {}
+
     def __init__(self, projnm):
 
         self.projnm = projnm
@@ -91,16 +205,25 @@ class FullwvDatastore(BaseDatastore):
         ini = readini(inifile)
         self.ini = ini
 
-        redict = compileDict(projnm, ftypeRegex)
+        if ini['srcs'].shape[1] <=3:
+            self._srcGeom = self._frozen(ini['srcs'][:,:2])
+            self._recGeom = self._frozen(ini['recs'][:,:2])
+        elif ini['srcs'].shape[1] == 4:
+            self._srcGeom = self._frozen(ini['srcs'][:,::2])
+            self._recGeom = self._frozen(ini['recs'][:,::2])
+        else:
+            raise Exception('Something went wrong!')
+
+        self._models = {}
+        self._dataFreqMaps = {}
 
-        keepers = {key: {} for key in redict}
-        files = glob.glob('*')
-        for file in files:
-            for key in redict:
-                match = redict[key].match(file)
-                if match is not None:
-                    keepers[key][file] = match.groupdict()
-                    break
+        combined = self._combinedRegex(projnm)
+
+        keepers = {key: {} for key in ftypeRegex}
+        for file in self._projectFiles(projnm):
+            key, groups = matchCombined(combined, file)
+            if key is not None:
+                keepers[key][file] = groups
         self.keepers = keepers
 
         handled = {}
@@ -109,31 +232,91 @@ class FullwvDatastore(BaseDatastore):
                 handled[fn] = self.handle(ftype, fn)
         self.handled = handled
 
+    @classmethod
+    def _combinedRegex(cls, projnm):
+        'Returns the compiled file-type alternation for a project name'
+
+        if projnm not in cls._regexCache:
+            cls._regexCache[projnm] = compileCombined(projnm, ftypeRegex)
+        return cls._regexCache[projnm]
+
+    @staticmethod
+    def _projectFiles(projnm):
+        '''
+        Yields the names of regular files in the working directory that
+        could belong to the project. Every file type is named with the
+        project name as its prefix, so other entries are skipped before
+        any regular expression is evaluated.
+        '''
+
+        if scandir is None:
+            for name in os.listdir('.'):
+                if name.startswith(projnm) and os.path.isfile(name):
+                    yield name
+            return
+
+        for entry in scandir('.'):
+            if entry.name.startswith(projnm) and entry.is_file():
+                yield entry.name
+
+    @staticmethod
+    def _frozen(arr):
+        'Returns a C-contiguous, native byte order, read-only copy of an array'
+
+        arr = np.array(arr, dtype=arr.dtype.newbyteorder('='), order='C')
+        arr.setflags(write=False)
+        return arr
+
+    def modelArray(self, fn, reciprocal=False):
+        '''
+        Returns the model stored in a file as a C-contiguous (nz, nx) array,
+        or its elementwise reciprocal. The array is read (and transposed
+        from the trace-major file layout) once, cached and shared between
+        calls, so it is read-only. Being C-contiguous, it ravels to the
+        solver's grid ordering without a copy; big-endian SEG-Y samples
+        are converted to native byte order on the way in.
+        '''
+
+        key = (fn, reciprocal)
+        if key not in self._models:
+            if reciprocal:
+                arr = self._frozen(1. / self.modelArray(fn))
+            else:
+                arr = self._frozen(self[fn].T)
+            assert arr.flags.c_contiguous
+            assert arr.dtype.isnative
+            self._models[key] = arr
+        return self._models[key]
+
     @staticmethod
     def sfWrapper(filename):
 
+        traces = _fastSEGYRead(filename)
+        if traces is not None:
+            return traces['samples']
+
         sf = SEGYFile(filename)
         return sf
 
     def handle(self, ftype, filename):
 
-        return self.sfWrapper(filename)
+        return _LazyHandle(self.sfWrapper, filename)
 
     def __getitem__(self, item):
 
-        if type(item) in {str, unicode}:
+        if isinstance(item, basestring):
             key = item
             sl = slice(None)
         elif type(item) is tuple:
             assert len(item) == 2
             key = item[0]
             sl = item[1]
-            assert type(key) is str
+            assert isinstance(key, basestring)
             assert (type(sl) is slice) or (type(sl) is int)
         else:
             raise TypeError()
 
-        if key.find(self.projnm) != 0:
+        if not key.startswith(self.projnm):
             key = self.projnm + key
 
         if key in self:
@@ -143,7 +326,7 @@ class FullwvDatastore(BaseDatastore):
 
     def __contains__(self, key):
 
-        if key.find(self.projnm) != 0:
+        if not key.startswith(self.projnm):
             key = self.projnm + key
         return key in self.handled
 
@@ -185,14 +368,8 @@ class FullwvDatastore(BaseDatastore):
             self.ini['fsl'],
         )
 
-        if self.ini['srcs'].shape[1] <=3:
-            srcGeom = self.ini['srcs'][:,:2]
-            recGeom = self.ini['recs'][:,:2]
-        elif self.ini['srcs'].shape[1] == 4:
-            srcGeom = self.ini['srcs'][:,::2]
-            recGeom = self.ini['recs'][:,::2]
-        else:
-            raise Exception('Something went wrong!')
+        srcGeom = self._srcGeom
+        recGeom = self._recGeom
 
         sc['geom'] = {
             'src':      srcGeom,
@@ -202,27 +379,27 @@ class FullwvDatastore(BaseDatastore):
 
         fn = '.vp'
         if fn in self:
-            sc['c'] = self[fn].T
+            sc['c'] = self.modelArray(fn)
 
         fn = '.qp'
         if fn in self:
-            sc['Q'] = 1./self[fn].T
+            sc['Q'] = self.modelArray(fn, reciprocal=True)
 
         fn = '.rho'
         if fn in self:
-            sc['rho'] = self[fn].T
+            sc['rho'] = self.modelArray(fn)
 
         fn = '.eps2d'
         if fn in self:
-            sc['eps'] = self[fn].T
+            sc['eps'] = self.modelArray(fn)
 
         fn = '.del2d'
         if fn in self:
-            sc['delta'] = self[fn].T
+            sc['delta'] = self.modelArray(fn)
 
         fn = '.theta'
         if fn in self:
-            sc['theta'] = self[fn].T
+            sc['theta'] = self.modelArray(fn)
 
         fn = '.src'
         if fn in self:
@@ -251,19 +428,102 @@ class FullwvDatastore(BaseDatastore):
 
         return fns, ffreqs
 
-    def spoolData(self, fid=slice(None), ftype='utobs'):
+    def dataFreqMap(self, ftype):
+        '''
+        Returns a dictionary mapping formatted frequencies ('%0.3f') to
+        the data files of a given type. The mapping is built on first
+        request and cached.
+        '''
+
+        if ftype not in self._dataFreqMaps:
+            dKeep = self.keepers['data']
+            freqMap = {}
+            for fn in dKeep:
+                if fn.find(ftype) > -1:
+                    freqMap.setdefault('%0.3f'%float(dKeep[fn]['freq']), fn)
+            self._dataFreqMaps[ftype] = freqMap
+        return self._dataFreqMaps[ftype]
+
+    def readPanel(self, fn):
+        '''
+        Reads a frequency-domain data panel from a file, returning a
+        complex (nrec, nsrc) array. The file is not kept open afterwards,
+        so that spooling through many panels does not leave each of them
+        mapped (and holding a file descriptor) for the datastore's lifetime.
+        '''
+
+        handle = self.handled[fn]
+        try:
+            fdata = handle[:]
+            # Real and imaginary parts are stored as alternating traces,
+            # so fill one complex panel in place rather than summing copies
+            panel = np.empty((fdata.shape[1], fdata.shape[0]//2), dtype=np.result_type(fdata.dtype, np.complex64))
+            panel.real = fdata[::2].T
+            panel.imag = fdata[1::2].T
+        finally:
+            handle.release()
+        return panel
+
+    def spoolData(self, fid=slice(None), ftype='utobs', prefetch=2):
+        '''
+        Yields the data panels for the requested frequencies, in order.
+        Panels are read ahead on a background thread, so that file I/O
+        overlaps with whatever the caller does with each panel. Up to
+        `prefetch` panels wait in the queue while the reader holds one
+        more, so at most prefetch + 1 panels are read ahead of the
+        caller; prefetch=0 reads each panel on demand.
+        '''
 
         ifreqs = self.ini['freqs'][fid]
-        fns, ffreqs = self.dataFiles(ftype)
-        sffreqs = ['%0.3f'%freq for freq in ffreqs]
+        freqMap = self.dataFreqMap(ftype)
         try:
-            finds = [sffreqs.index('%0.3f'%freq) for freq in ifreqs]
-        except ValueError as e:
+            fns = [freqMap['%0.3f'%freq] for freq in ifreqs]
+        except KeyError as e:
             raise ValueError('Could not find data from all requested frequencies: %s'%e)
 
-        for fi in finds:
-            fdata = self[fns[fi]]
-            yield fdata[::2].T + 1j*fdata[1::2].T
+        if not prefetch:
+            for fn in fns:
+                yield self.readPanel(fn)
+            return
+
+        panels = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    panels.put(item, timeout=PREFETCH_POLL)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        def produce():
+            try:
+                for fn in fns:
+                    if not put((None, self.readPanel(fn))):
+                        return
+            except Exception as e:
+                put((e, None))
+            else:
+                put((None, done))
+
+        reader = threading.Thread(target=produce)
+        reader.daemon = True
+        reader.start()
+
+        try:
+            while True:
+                error, panel = panels.get()
+                if error is not None:
+                    raise error
+                if panel is done:
+                    break
+                yield panel
+        finally:
+            stop.set()
+            reader.join()
 
     def utoutWrite(self, data, fid=slice(None), ftype='utout'):
 
@@ -176,3 +176,44 @@ def compileDict(projnm, exprdict):
         redict[key] = reentry
 
     return redict
+
+def compileCombined(projnm, exprdict):
+    '''
+    Given a dictionary of regular expressions in text form, assembles a
+    single pre-compiled alternation that classifies a filename with one
+    match. Each entry becomes a named group 'ftype_<key>', and any named
+    groups inside it are renamed to '<key>__<name>' so that they remain
+    unique across alternatives.
+    '''
+
+    alternatives = []
+    for key in exprdict:
+        # Try to insert the project name
+        try:
+            expr = exprdict[key]%projnm
+        # Except for cases in which it doesn't get used
+        except TypeError:
+            expr = exprdict[key]
+
+        expr = re.sub(r'\(\?P<(\w+)>', r'(?P<%s__\1>'%key, expr)
+        alternatives.append('(?P<ftype_%s>%s)'%(key, expr))
+
+    return re.compile('|'.join(alternatives))
+
+def matchCombined(combined, filename):
+    '''
+    Matches a filename against an expression built by compileCombined.
+
+    Returns:
+        tuple: The matching key and its group dictionary, or (None, None)
+    '''
+
+    match = combined.match(filename)
+    if match is None:
+        return None, None
+
+    key = match.lastgroup.split('_', 1)[1]
+    prefix = '%s__'%key
+    groups = {name[len(prefix):]: value for name, value in match.groupdict().items() if name.startswith(prefix)}
+
+    return key, groups